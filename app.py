@@ -7,9 +7,15 @@ import sys
 import time
 import json
 import logging
+import logging.handlers
+import sqlite3
 import webbrowser
 import threading
-from flask import Flask, render_template, request, redirect, url_for
+from collections import deque, namedtuple
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from flask import Flask, render_template, request, redirect, url_for, jsonify, Response
 from pystray import Icon, MenuItem, Menu
 from PIL import Image, ImageDraw
 import idlelib.tree  # Explicit import required so PyInstaller bundles it
@@ -44,19 +50,42 @@ if not os.path.exists(APP_DATA_DIR):
 
 config_file = os.path.join(APP_DATA_DIR, "wifi_ip_config.json")
 log_file = os.path.join(APP_DATA_DIR, "wifi_ip_switcher.log")
+events_db_file = os.path.join(APP_DATA_DIR, "wifi_ip_events.db")
+log_max_bytes = 2 * 1024 * 1024  # rotate the log at 2 MB...
+log_backup_count = 3             # ...keeping 3 old files
+max_switch_events = 10000        # switch events kept in the event store (oldest pruned)
+lint_display_limit = 50          # lint issues listed on the index page (full list at /lint)
 check_interval = 5
+config_watch_interval = 1  # seconds between config file mtime checks
+ssid_debounce_probes = 1   # consecutive probes an SSID must be seen before switching
+max_adapter_workers = 4    # upper bound on adapters applied to concurrently
+dhcp_ip_refresh_probes = 6 # ticks to keep re-reading the IP after a DHCP revert
+trace_buffer_size = 50000  # span events kept while tick tracing is on (oldest dropped)
+sample_interval = 0.01     # seconds between sampling profiler snapshots
+max_sample_seconds = 300   # longest sampling run accepted from the tray/HTTP
 icon_path = "wifi_ip_switcher.ico"
 TASK_NAME = "WiFiIPSwitcherStartupTask"
 active_port = 5000  # will be updated by start_flask_app() to whichever port binds
 
+# Tray status modes — one pre-rendered icon variant per mode
+STATUS_STATIC = "static"
+STATUS_DHCP = "dhcp"
+STATUS_APPLYING = "applying"
+STATUS_ERROR = "error"
+STATUS_NO_ADAPTER = "no_adapter"
+
 
 # === Logging Setup ===
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
+# Rotating handler so the log no longer grows forever. Structured switch
+# history lives in the event store (see EventStore below), not the log.
+file_handler = logging.handlers.RotatingFileHandler(
+    log_file,
+    maxBytes=log_max_bytes,
+    backupCount=log_backup_count,
     encoding='utf-8'
 )
+file_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[file_handler])
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 logging.getLogger().addHandler(console_handler)
@@ -176,30 +205,56 @@ def run_netsh_command(command_args):
 
 
 # === Wi-Fi Interface Detection ===
-def get_wifi_interface_name():
+def get_wifi_interfaces():
     """
-    Reads 'netsh wlan show interfaces' and returns the adapter name.
-    Falls back to 'Wi-Fi' if detection fails, but logs a clear warning.
+    Reads 'netsh wlan show interfaces' once and returns an ordered dict of
+    {adapter name: connected SSID or None} for EVERY wireless adapter.
 
-    Why we parse 'Name' specifically:
-      The output contains lines like:
+    One netsh call probes all adapters at once, so probe cost does not grow
+    with the number of adapters. The output has one block per adapter:
         Name                   : Wi-Fi
         Description            : Intel Wireless-AC 9560
-      We match the first line that starts with 'Name' and has a colon.
+        ...
+        SSID                   : OfficeWiFi
+        BSSID                  : aa:bb:cc:dd:ee:ff
+    Each 'Name' line starts a new adapter; the 'SSID' line that follows
+    (but not 'BSSID') belongs to it. Disconnected adapters have no SSID.
     """
-    logging.info("[INTERFACE] Detecting Wi-Fi interface name...")
+    interfaces = {}
     output = run_netsh_command(["netsh", "wlan", "show", "interfaces"])
-    if output:
-        for line in output.splitlines():
-            # FIXED #7 (partial): More precise match — must start with 'Name'
-            # Old code used 'if "Name" in line' which could match
-            # "Interface Name", "Profile Name", etc. on localized Windows.
-            stripped = line.strip()
-            if stripped.startswith("Name") and ":" in stripped:
-                name = stripped.split(":", 1)[1].strip()
-                if name:
-                    logging.info(f"[INTERFACE] Detected: '{name}'")
-                    return name
+    if not output:
+        return interfaces
+
+    current = None
+    for line in output.splitlines():
+        # FIXED #7 (partial): More precise match — must start with 'Name'
+        # Old code used 'if "Name" in line' which could match
+        # "Interface Name", "Profile Name", etc. on localized Windows.
+        stripped = line.strip()
+        if ":" not in stripped:
+            continue
+        value = stripped.split(":", 1)[1].strip()
+        if stripped.startswith("Name"):
+            current = value or None
+            if current:
+                interfaces[current] = None
+        elif current and stripped.startswith("SSID") and "BSSID" not in stripped:
+            interfaces[current] = value.strip('"') or None
+    return interfaces
+
+
+def get_wifi_interface_name():
+    """
+    Returns the name of the first wireless adapter, or None.
+    Used for the startup log and the tray's initial icon; the monitor
+    itself tracks every adapter via get_wifi_interfaces().
+    """
+    logging.info("[INTERFACE] Detecting Wi-Fi interface name...")
+    interfaces = get_wifi_interfaces()
+    if interfaces:
+        for name in interfaces:
+            logging.info(f"[INTERFACE] Detected: '{name}'")
+        return next(iter(interfaces))
 
     # Return None instead of a hardcoded "Wi-Fi" fallback.
     # With 0s Task Scheduler delay, the adapter may not be enumerable yet
@@ -213,17 +268,6 @@ def get_wifi_interface_name():
     return None
 
 
-def get_connected_ssid():
-    """Returns the SSID of the currently connected Wi-Fi network, or None."""
-    output = run_netsh_command(["netsh", "wlan", "show", "interfaces"])
-    if output:
-        for line in output.splitlines():
-            stripped = line.strip()
-            if stripped.startswith("SSID") and "BSSID" not in stripped:
-                return stripped.split(":", 1)[1].strip().strip('"')
-    return None
-
-
 def get_current_ip(interface):
     """Returns the current IP address of the interface, or None."""
     output = run_netsh_command(
@@ -260,7 +304,10 @@ def is_dhcp_enabled(interface):
 
 
 def set_static_ip(interface, ip, subnet, gateway, preferred_dns, alternate_dns):
-    """Applies a static IP configuration to the named network interface."""
+    """
+    Applies a static IP configuration to the named network interface.
+    Returns True if every netsh step succeeded.
+    """
     logging.info(f"[NETWORK] Setting static IP on '{interface}': {ip}")
     success = True
 
@@ -286,10 +333,14 @@ def set_static_ip(interface, ip, subnet, gateway, preferred_dns, alternate_dns):
         logging.info(f"[NETWORK] Static IP set successfully on '{interface}': {ip}")
     else:
         logging.error(f"[NETWORK] Failed to set static IP on '{interface}'.")
+    return success
 
 
 def set_dhcp_ip(interface):
-    """Reverts the interface to automatic IP and DNS via DHCP."""
+    """
+    Reverts the interface to automatic IP and DNS via DHCP.
+    Returns True if every netsh step succeeded.
+    """
     logging.info(f"[NETWORK] Setting DHCP on '{interface}'...")
     success = True
 
@@ -307,41 +358,37 @@ def set_dhcp_ip(interface):
         logging.info(f"[NETWORK] DHCP enabled successfully on '{interface}'.")
     else:
         logging.error(f"[NETWORK] Failed to enable DHCP on '{interface}'.")
+    return success
 
 
 # === Config Handling ===
-def load_or_create_config():
-    """
-    Loads the JSON config file. Returns empty dict if missing or corrupted.
-    Logs at DEBUG level (not INFO) to avoid 17KB/day log spam from the
-    monitor loop calling this every 5 seconds.
+# Exceptions read_config_file() raises for an unreadable / unparseable file
+# (json.JSONDecodeError is a ValueError).
+CONFIG_READ_ERRORS = (OSError, ValueError)
+
+
+def read_config_file():
     """
-    if os.path.exists(config_file):
-        try:
-            with open(config_file, "r", encoding='utf-8') as f:
-                config_data = json.load(f)
-                # FIXED #2: Changed INFO → DEBUG.
-                # This function is called every 5 seconds by the monitor loop.
-                # Logging at INFO was writing ~17KB/day to the log file for
-                # one line that provides zero diagnostic value during normal ops.
-                logging.debug("[CONFIG] Configuration loaded.")
-                return config_data
-        except json.JSONDecodeError as e:
-            logging.error(
-                f"[CONFIG] Corrupted config '{config_file}': {e}. Resetting.",
-                exc_info=True
-            )
-            try:
-                os.remove(config_file)
-            except Exception as e_del:
-                logging.error(f"[CONFIG] Could not delete corrupted file: {e_del}")
-            return {}
-        except Exception as e:
-            logging.error(f"[CONFIG] Error reading config: {e}", exc_info=True)
-            return {}
+    Loads the JSON config file. Returns {} only if the file is genuinely
+    missing; a JSON typo, a half-written file or a non-object top level
+    raises one of CONFIG_READ_ERRORS instead.
+
+    The file is NEVER deleted or reset here. A hand edit with a typo must
+    not wipe every profile (and, via the watcher, revert every adapter to
+    DHCP) — callers keep their last good state or report the error, and
+    the user fixes the file.
 
-    logging.debug("[CONFIG] Config file not found, returning empty config.")
-    return {}
+    Logs at DEBUG level (not INFO): the watcher and every page load call
+    this, and a per-read INFO line would only spam the log.
+    """
+    if not os.path.exists(config_file):
+        return {}
+    with open(config_file, "r", encoding='utf-8') as f:
+        config_data = json.load(f)
+    if not isinstance(config_data, dict):
+        raise ValueError("top level must be a JSON object")
+    logging.debug("[CONFIG] Configuration loaded.")
+    return config_data
 
 
 def save_config(config):
@@ -365,6 +412,10 @@ def save_config(config):
             os.fsync(f.fileno())  # ensure data hits disk before replacing
         os.replace(tmp_file, config_file)  # atomic on Windows & POSIX
         logging.info("[CONFIG] Configuration saved.")
+        # Compile from the in-memory dict we just wrote — no re-read needed.
+        # This also records the new file stamp so the watcher does not
+        # reload the same change a second time.
+        reload_apply_plans(config)
     except Exception as e:
         logging.error(f"[CONFIG] Error saving config: {e}", exc_info=True)
         try:
@@ -374,106 +425,1146 @@ def save_config(config):
             pass
 
 
-# === Monitor Loop ===
-def monitor_ssid_loop(interface_name):
+# === Status Channel ===
+# The monitor pushes its state to the tray through a coalescing channel with
+# one slot per adapter. publish() only swaps a reference and sets an event,
+# so it never blocks the monitor on the tray; if several updates arrive
+# before the tray wakes, only the latest one per adapter is shown
+# (intermediate states are coalesced away).
+# interface is None for the "no adapter found" status.
+TrayStatus = namedtuple("TrayStatus", ["mode", "ssid", "ip", "interface"])
+
+
+class StatusChannel:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._latest = {}
+
+    def publish(self, status):
+        """Replaces the pending status for status.interface. Never blocks."""
+        with self._lock:
+            latest = dict(self._latest)
+            latest[status.interface] = status
+            self._latest = latest
+        self._event.set()
+
+    def discard(self, interface):
+        """Drops the slot of an adapter that has disappeared."""
+        with self._lock:
+            if interface not in self._latest:
+                return
+            latest = dict(self._latest)
+            del latest[interface]
+            self._latest = latest
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until something is published, then returns a snapshot
+        {interface: TrayStatus} of the latest status of every adapter.
+        """
+        if not self._event.wait(timeout):
+            return None
+        with self._lock:
+            self._event.clear()
+            return self._latest
+
+
+status_channel = StatusChannel()
+
+
+# === Profiling ===
+# Two runtime-toggleable tools for "it pegs the CPU" / "it is slow to switch"
+# reports, both reachable from the tray Diagnostics menu and /profiling:
+#
+#   1. Tick tracing — trace_span() records how long each monitor step takes.
+#      Every monitor iteration is one "tick" span with "probe" and "match"
+#      nested inside; the "apply" / "verify" spans it triggers appear on the
+#      AdapterWorker threads. "config_load" and "parse" are NOT per-tick:
+#      they only appear when the config is reloaded (watcher or web save
+#      thread). When tracing is off, trace_span() returns one shared no-op
+#      context manager, so the hot path pays a single flag check and no
+#      allocation.
+#   2. Sampling profiler — a background thread snapshots every thread's
+#      stack every `sample_interval` seconds for N seconds (wall-clock).
+#
+# Traces export as Chrome trace JSON (chrome://tracing, Perfetto) and
+# samples as speedscope JSON (https://www.speedscope.app).
+_tracing_enabled = False
+_trace_events = deque(maxlen=trace_buffer_size)
+_trace_origin = time.perf_counter()
+_NULL_SPAN = nullcontext()
+
+_sampler_lock = threading.Lock()
+_sampler_running = False
+_last_sample_profile = None  # speedscope dict from the last finished run
+
+
+class _Span:
+    __slots__ = ("name", "detail", "start")
+
+    def __init__(self, name, detail):
+        self.name = name
+        self.detail = detail
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        thread = threading.current_thread()
+        # deque.append is atomic, so worker threads need no extra lock
+        _trace_events.append(
+            (self.name, self.detail, self.start, end - self.start,
+             thread.ident, thread.name, exc_type is not None)
+        )
+        return False
+
+
+def trace_span(name, detail=None):
+    """
+    Times the enclosed block as one span while tick tracing is enabled.
+    detail is an optional short string (e.g. the adapter name) shown in
+    the exported trace. Zero-cost no-op when tracing is disabled.
     """
-    Polls the connected SSID every `check_interval` seconds.
-    When the SSID changes, applies the matching static IP config
-    or reverts to DHCP if no config exists for that SSID.
+    if not _tracing_enabled:
+        return _NULL_SPAN
+    return _Span(name, detail)
+
+
+def set_tracing(enabled):
+    """Turns tick tracing on or off. Turning it on starts a fresh buffer."""
+    global _tracing_enabled
+    if enabled and not _tracing_enabled:
+        _trace_events.clear()
+    _tracing_enabled = enabled
+    logging.info(f"[PROFILE] Tick tracing {'enabled' if enabled else 'disabled'}.")
+
 
-    Receives interface_name as a parameter — NOT read from global scope.
-    This makes the dependency explicit and avoids any startup race condition
-    where threads might read the global before main() sets it.
+def export_chrome_trace():
     """
-    last_ssid = None
-    logging.info("[MONITOR] SSID monitoring started.")
+    Returns the recorded spans in Chrome trace event format
+    ('X' complete events, timestamps in microseconds).
+    """
+    events = []
+    thread_names = {}
+    for name, detail, start, duration, tid, thread_name, failed in list(_trace_events):
+        thread_names[tid] = thread_name
+        args = {}
+        if detail:
+            args["detail"] = detail
+        if failed:
+            args["error"] = True
+        events.append({
+            "name": name,
+            "cat": "monitor",
+            "ph": "X",
+            "ts": round((start - _trace_origin) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": args,
+        })
+    for tid, thread_name in thread_names.items():
+        events.append({
+            "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+            "args": {"name": thread_name},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def run_sampling_profiler(seconds):
+    """
+    Samples the stack of every other thread every `sample_interval` seconds
+    for `seconds`, then stores the result as a speedscope profile (one
+    profile per thread). Blocks the calling thread — callers run it on a
+    background thread via start_sampling_profiler().
+    """
+    global _last_sample_profile
+
+    own_ident = threading.get_ident()
+    frame_index = {}   # (function, file, first line) -> index in frames
+    frames = []
+    samples = {}       # thread ident -> ([stack, ...], [weight_ms, ...])
+    thread_names = {}
+
+    started = last = time.perf_counter()
+    deadline = started + seconds
+    while last < deadline:
+        time.sleep(sample_interval)
+        now = time.perf_counter()
+        weight = (now - last) * 1000.0
+        last = now
+
+        for thread in threading.enumerate():
+            thread_names[thread.ident] = thread.name
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = (code.co_name, code.co_filename, code.co_firstlineno)
+                index = frame_index.get(key)
+                if index is None:
+                    index = frame_index[key] = len(frames)
+                    frames.append(key)
+                stack.append(index)
+                frame = frame.f_back
+            stack.reverse()  # speedscope wants root first
+            thread_samples = samples.setdefault(ident, ([], []))
+            thread_samples[0].append(stack)
+            thread_samples[1].append(weight)
+
+    duration_ms = (last - started) * 1000.0
+    _last_sample_profile = {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": f"Wi-Fi IP Switcher — {seconds}s sample",
+        "exporter": "wifi_ip_switcher",
+        "shared": {
+            "frames": [
+                {"name": name, "file": file, "line": line}
+                for name, file, line in frames
+            ]
+        },
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": thread_names.get(ident, str(ident)),
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": duration_ms,
+                "samples": stacks,
+                "weights": weights,
+            }
+            for ident, (stacks, weights) in samples.items()
+        ],
+    }
+    total = sum(len(stacks) for stacks, _ in samples.values())
+    logging.info(f"[PROFILE] Sampling finished: {total} samples over {seconds}s.")
+    return _last_sample_profile
 
+
+def start_sampling_profiler(seconds, on_done=None):
+    """
+    Starts run_sampling_profiler() on a background thread.
+    Returns False if a sampling run is already in progress.
+    on_done(profile) is called on the profiler thread when it finishes.
+    """
+    global _sampler_running
+
+    with _sampler_lock:
+        if _sampler_running:
+            return False
+        _sampler_running = True
+
+    def worker():
+        global _sampler_running
+        try:
+            profile = run_sampling_profiler(seconds)
+            if on_done is not None:
+                on_done(profile)
+        except Exception as e:
+            logging.error(f"[PROFILE] Sampling profiler failed: {e}", exc_info=True)
+        finally:
+            with _sampler_lock:
+                _sampler_running = False
+
+    logging.info(f"[PROFILE] Sampling all threads for {seconds}s...")
+    threading.Thread(target=worker, name="SamplingProfilerThread", daemon=True).start()
+    return True
+
+
+def write_profile_file(prefix, data):
+    """Writes an exported trace/profile next to the log file and returns its path."""
+    path = os.path.join(
+        APP_DATA_DIR, f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    with open(path, "w", encoding='utf-8') as f:
+        json.dump(data, f)
+    logging.info(f"[PROFILE] Wrote {path}")
+    return path
+
+
+# === Apply Plans ===
+# Each profile is compiled once — when it is saved or the file changes on
+# disk — into an immutable, pre-validated ApplyPlan. The monitor only reads
+# the current plan mapping, so no JSON parsing or validation happens per tick.
+# interface is "" for profiles that apply to any adapter, or the name of
+# the one adapter the profile is pinned to.
+ApplyPlan = namedtuple(
+    "ApplyPlan",
+    ["ssid", "ip", "subnet", "gateway", "preferred_dns", "alternate_dns", "interface"]
+)
+
+_apply_plans = MappingProxyType({})  # ssid -> ApplyPlan, or None if invalid
+_apply_plans_lock = threading.Lock()
+_config_stamp = None
+config_changed = threading.Event()  # set whenever the compiled plans change
+
+
+def compile_apply_plan(ssid, profile):
+    """
+    Validates one profile dict and returns an ApplyPlan.
+    Raises ValueError describing the problem if the profile is unusable,
+    so both the web form and hand-edited JSON go through the same checks.
+    """
+    required = ("ip", "subnet", "gateway", "preferred_dns")
+    missing = [key for key in required if not str(profile.get(key) or "").strip()]
+    if missing:
+        raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    values = {
+        key: str(profile.get(key) or "").strip()
+        for key in required + ("alternate_dns", "interface")
+    }
+
+    invalid_fields = []
+    for field_name, key in [
+        ("IP Address", "ip"),
+        ("Subnet Mask", "subnet"),
+        ("Gateway", "gateway"),
+        ("Preferred DNS", "preferred_dns"),
+    ]:
+        if not is_valid_ipv4(values[key]):
+            invalid_fields.append(field_name)
+
+    if values["alternate_dns"] and not is_valid_ipv4(values["alternate_dns"]):
+        invalid_fields.append("Alternate DNS")
+
+    if invalid_fields:
+        raise ValueError(f"Invalid IP format in: {', '.join(invalid_fields)}")
+
+    return ApplyPlan(ssid=ssid, **values)
+
+
+def get_config_stamp():
+    """Returns (mtime_ns, size) of the config file, or None if it is missing."""
+    try:
+        st = os.stat(config_file)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def reload_apply_plans(config=None):
+    """
+    Compiles every profile into an ApplyPlan and swaps in the new mapping.
+
+    If config is None the file is read from disk. The file stamp is taken
+    BEFORE reading, so a write that lands mid-read is picked up by the
+    watcher on its next check instead of being missed.
+
+    If the file cannot be parsed (a typo, or an editor caught mid-write)
+    the last good plans are kept and nothing is signalled — the adapters
+    are not touched, and the watcher retries when the file changes again.
+    Returns True if new plans were swapped in.
+
+    Invalid profiles map to None: the monitor leaves the adapter alone for
+    those SSIDs rather than guessing, and the error is logged once here
+    instead of on every tick.
+
+    Traced as "config_load" / "parse" spans — these appear only when a
+    reload happens, never inside a monitor tick.
+    """
+    global _apply_plans, _config_stamp
+
+    with _apply_plans_lock:
+        stamp = get_config_stamp()
+        if config is None:
+            try:
+                with trace_span("config_load"):
+                    config = read_config_file()
+            except CONFIG_READ_ERRORS as e:
+                logging.error(
+                    f"[CONFIG] Could not read '{config_file}': {e}. "
+                    f"Keeping the last good profiles until the file is fixed."
+                )
+                # Record the stamp so we only retry once the file changes again
+                _config_stamp = stamp
+                return False
+
+        plans = {}
+        with trace_span("parse"):
+            for ssid, profile in config.items():
+                try:
+                    if not isinstance(profile, dict):
+                        raise ValueError("Profile must be a JSON object")
+                    plans[ssid] = compile_apply_plan(ssid, profile)
+                except ValueError as e:
+                    logging.error(f"[CONFIG] Profile for SSID '{ssid}' is invalid: {e}")
+                    plans[ssid] = None
+
+        _apply_plans = MappingProxyType(plans)
+        _config_stamp = stamp
+
+    logging.debug(f"[CONFIG] Compiled {len(plans)} apply plan(s).")
+    config_changed.set()  # wake the monitor for an immediate re-evaluation
+    return True
+
+
+def watch_config_file_loop():
+    """
+    Polls the config file's mtime/size every `config_watch_interval` seconds
+    and recompiles the apply plans when it changes on disk (e.g. the JSON
+    was edited by hand). os.stat is cheap, so this can run far more often
+    than the SSID probe. Saves made through the web UI update the stamp
+    themselves and are not reloaded twice.
+    """
+    logging.info("[CONFIG] Config file watcher started.")
     while True:
         try:
-            # --- Lazy interface detection with retry ---
-            # With 0s Task Scheduler delay, the Wi-Fi adapter may not be
-            # enumerable yet when the app starts. get_wifi_interface_name()
-            # returns None in that case. We retry every check_interval seconds
-            # until the adapter reports itself — no hardcoded fallback needed.
-            if interface_name is None:
-                interface_name = get_wifi_interface_name()
-                if interface_name is None:
-                    logging.info(
-                        "[MONITOR] Wi-Fi adapter not ready yet. "
-                        f"Retrying in {check_interval}s..."
-                    )
-                    time.sleep(check_interval)
-                    continue
-                logging.info(f"[MONITOR] Interface resolved: '{interface_name}'")
-
-            ssid = get_connected_ssid()
-            config = load_or_create_config()
-
-            if ssid != last_ssid:
-                logging.info(
-                    f"[MONITOR] SSID changed: '{last_ssid}' → '{ssid}'"
+            if get_config_stamp() != _config_stamp:
+                logging.info("[CONFIG] Config file changed on disk. Reloading profiles.")
+                reload_apply_plans()
+        except Exception as e:
+            logging.error(f"[CONFIG] Watcher exception: {e}", exc_info=True)
+        time.sleep(config_watch_interval)
+
+
+def match_apply_plan(plans, ssid, interface_name, owner=None):
+    """
+    Returns the ApplyPlan for `ssid` on this adapter, or None.
+    A profile pinned to another adapter does not match — this adapter
+    falls back to DHCP on that network, exactly as for an unknown SSID.
+
+    owner is set when several adapters are on the same SSID and its
+    profile is not pinned: only the owner adapter gets the static IP
+    (two adapters with one address is a guaranteed conflict), the rest
+    fall back to DHCP.
+    """
+    if not ssid:
+        return None
+    plan = plans.get(ssid)
+    if plan is None:
+        return None
+    if plan.interface:
+        return plan if plan.interface == interface_name else None
+    if owner is not None and owner != interface_name:
+        return None
+    return plan
+
+
+def assign_unpinned_owners(interfaces, plans, adapters):
+    """
+    For every SSID seen on more than one adapter whose profile is not
+    pinned, picks the single adapter that gets the static plan.
+    Returns {ssid: adapter name}.
+
+    The adapter that already holds the plan keeps it, so a second adapter
+    joining the network never steals the address; otherwise the first
+    adapter in netsh order wins.
+    """
+    by_ssid = {}
+    for name, ssid in interfaces.items():
+        plan = plans.get(ssid) if ssid else None
+        if plan is not None and not plan.interface:
+            by_ssid.setdefault(ssid, []).append(name)
+
+    owners = {}
+    for ssid, names in by_ssid.items():
+        if len(names) < 2:
+            continue
+        plan = plans[ssid]
+        holders = [
+            name for name in names
+            if name in adapters
+            and adapters[name].last_ssid == ssid
+            and adapters[name].last_plan == plan
+        ]
+        owners[ssid] = holders[0] if holders else names[0]
+    return owners
+
+
+def apply_plan(interface_name, ssid, plan, force=False):
+    """
+    Brings the interface in line with the compiled plan for `ssid`.
+
+    plan is an ApplyPlan (static IP), None with the SSID present in the
+    plan mapping (invalid profile — leave the adapter alone), or None for
+    an unknown SSID (revert to DHCP). force=True re-applies a static plan
+    even if the IP already matches — used when the profile was edited, since
+    the subnet, gateway or DNS may have changed while the IP did not.
+
+    Returns the resulting tray status mode (STATUS_STATIC, STATUS_DHCP or
+    STATUS_ERROR). STATUS_APPLYING is published while netsh is running.
+    """
+    if plan is not None:
+        # Known SSID — apply the saved static IP if not already set
+        if force or get_current_ip(interface_name) != plan.ip:
+            logging.info(
+                f"[MONITOR] Applying static IP for SSID '{ssid}' on '{interface_name}'."
+            )
+            status_channel.publish(
+                TrayStatus(STATUS_APPLYING, ssid, plan.ip, interface_name)
+            )
+            ok = set_static_ip(
+                interface_name,
+                plan.ip,
+                plan.subnet,
+                plan.gateway,
+                plan.preferred_dns,
+                plan.alternate_dns
+            )
+            return STATUS_STATIC if ok else STATUS_ERROR
+        logging.info(f"[MONITOR] Static IP already correct for '{ssid}'.")
+        return STATUS_STATIC
+
+    if ssid and ssid in _apply_plans and _apply_plans[ssid] is None:
+        logging.warning(
+            f"[MONITOR] Profile for SSID '{ssid}' is invalid. "
+            f"Leaving adapter unchanged."
+        )
+        return STATUS_ERROR
+
+    # Unknown SSID (or disconnected) — revert to DHCP
+    # FIXED #5: Use is_dhcp_enabled() instead of "0.0.0.0" check.
+    # Old check: current_ip != "0.0.0.0"
+    # Problem:   DHCP gives real IPs (192.168.x.x), not 0.0.0.0.
+    #            So set_dhcp_ip() was called even when already on DHCP,
+    #            causing an unnecessary network reset every 5 seconds.
+    # Fix:       Ask netsh if DHCP is enabled. Only call set_dhcp_ip()
+    #            if the interface is currently using a static config.
+    if not is_dhcp_enabled(interface_name):
+        logging.info(
+            f"[MONITOR] SSID '{ssid}' not in config for '{interface_name}'. "
+            f"Reverting to DHCP."
+        )
+        status_channel.publish(TrayStatus(STATUS_APPLYING, ssid, None, interface_name))
+        return STATUS_DHCP if set_dhcp_ip(interface_name) else STATUS_ERROR
+
+    logging.info(
+        f"[MONITOR] SSID '{ssid}' not in config for '{interface_name}'. "
+        f"Already on DHCP, no action needed."
+    )
+    return STATUS_DHCP
+
+
+# === Profile Lint ===
+# Cross-checks what compile_apply_plan() cannot see from one field at a
+# time: mask shape, gateway reachability, and conflicts BETWEEN profiles.
+# Everything is done on 32-bit ints with one sort, so a full-store audit of
+# tens of thousands of imported profiles stays O(n log n).
+LINT_ERROR = "error"      # profile will not work — blocks a save
+LINT_WARNING = "warning"  # profile works but probably conflicts with another
+
+LintIssue = namedtuple("LintIssue", ["severity", "code", "ssids", "message"])
+
+
+def ipv4_to_int(value):
+    """Converts a dotted-quad string (already checked by is_valid_ipv4) to an int."""
+    a, b, c, d = (int(part) for part in value.split('.'))
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+def int_to_ipv4(value):
+    return ".".join(str((value >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+
+
+def mask_prefix_length(mask_int):
+    """
+    Returns the CIDR prefix length of a netmask, or None if the mask is
+    not contiguous (e.g. 255.0.255.0) — netsh rejects those.
+    """
+    inverted = ~mask_int & 0xFFFFFFFF
+    if inverted & (inverted + 1):
+        return None
+    return 32 - inverted.bit_length()
+
+
+def lint_profiles(config):
+    """
+    Checks every profile and returns a list of LintIssue, errors first.
+
+    Per profile:  invalid format, non-contiguous or empty mask, gateway
+                  outside IP/subnet, IP equal to the network or broadcast
+                  address.
+    Across all:   the same static IP in several profiles, and overlapping
+                  subnets.
+
+    CIDR blocks can only be disjoint or nested, never partially overlap, so
+    the overlap check is a single sweep over the blocks sorted by
+    (start, -end) with a stack of enclosing blocks: each block is reported
+    against its nearest enclosing one only, and names that parent by CIDR
+    rather than listing its SSIDs. Identical subnets are grouped into one
+    issue. Every SSID therefore appears in O(1) issues, so the output is
+    linear in the number of profiles.
+    """
+    issues = []
+    ip_owners = {}    # ip int -> [ssid, ...]
+    networks = {}     # (start, end) -> [ssid, ...]
+
+    for ssid, profile in config.items():
+        try:
+            if not isinstance(profile, dict):
+                raise ValueError("Profile must be a JSON object")
+            plan = compile_apply_plan(ssid, profile)
+        except ValueError as e:
+            issues.append(LintIssue(LINT_ERROR, "invalid_profile", (ssid,), str(e)))
+            continue
+
+        ip = ipv4_to_int(plan.ip)
+        mask = ipv4_to_int(plan.subnet)
+        prefix = mask_prefix_length(mask)
+        if prefix is None or prefix == 0:
+            issues.append(LintIssue(
+                LINT_ERROR, "invalid_mask", (ssid,),
+                f"Subnet mask {plan.subnet} is not a valid contiguous mask."
+            ))
+            continue
+
+        start = ip & mask
+        end = start | (~mask & 0xFFFFFFFF)
+        cidr = f"{int_to_ipv4(start)}/{prefix}"
+
+        if ipv4_to_int(plan.gateway) & mask != start:
+            issues.append(LintIssue(
+                LINT_ERROR, "gateway_outside_subnet", (ssid,),
+                f"Gateway {plan.gateway} is not inside {cidr}."
+            ))
+
+        # /31 and /32 have no separate network/broadcast addresses
+        if prefix < 31 and ip in (start, end):
+            kind = "network" if ip == start else "broadcast"
+            issues.append(LintIssue(
+                LINT_ERROR, "reserved_address", (ssid,),
+                f"IP {plan.ip} is the {kind} address of {cidr}."
+            ))
+
+        ip_owners.setdefault(ip, []).append(ssid)
+        networks.setdefault((start, end), []).append(ssid)
+
+    for ip, ssids in ip_owners.items():
+        if len(ssids) > 1:
+            issues.append(LintIssue(
+                LINT_WARNING, "duplicate_ip", tuple(ssids),
+                f"IP {int_to_ipv4(ip)} is assigned by {len(ssids)} profiles."
+            ))
+
+    enclosing = []  # stack of (start, end) blocks containing the current one
+    for start, end in sorted(networks, key=lambda block: (block[0], -block[1])):
+        while enclosing and enclosing[-1][1] < start:
+            enclosing.pop()
+
+        ssids = networks[(start, end)]
+        prefix = 32 - (end - start).bit_length()
+        cidr = f"{int_to_ipv4(start)}/{prefix}"
+        if len(ssids) > 1:
+            issues.append(LintIssue(
+                LINT_WARNING, "subnet_overlap", tuple(ssids),
+                f"{len(ssids)} profiles use the same subnet {cidr}."
+            ))
+        if enclosing:
+            # Name the parent by CIDR and one representative SSID only —
+            # copying all of its SSIDs into every child issue would make
+            # the output O(children × parent profiles).
+            parent = enclosing[-1]
+            parent_prefix = 32 - (parent[1] - parent[0]).bit_length()
+            parent_ssids = networks[parent]
+            owner = f"'{parent_ssids[0]}'"
+            if len(parent_ssids) > 1:
+                owner += f" and {len(parent_ssids) - 1} more"
+            issues.append(LintIssue(
+                LINT_WARNING, "subnet_overlap", tuple(ssids),
+                f"Subnet {cidr} overlaps "
+                f"{int_to_ipv4(parent[0])}/{parent_prefix} (used by {owner})."
+            ))
+        enclosing.append((start, end))
+
+    issues.sort(key=lambda issue: (issue.severity != LINT_ERROR, issue.ssids))
+    return issues
+
+
+# === Switch Event Store ===
+# One row per apply the monitor performs, so slow or failing networks can be
+# found by query instead of by grepping the log. SQLite ships with Python,
+# survives restarts, and gives indexed lookups by SSID and time. The table
+# is pruned to the newest `max_switch_events` rows (plus at most one prune
+# interval of newer ones) so it stays bounded across restarts.
+SWITCH_EVENT_COLUMNS = (
+    "id", "ts", "interface", "from_ssid", "to_ssid", "plan", "outcome",
+    "forced", "queue_ms", "apply_ms", "verify_ms", "total_ms"
+)
+
+
+class EventStore:
+    # Inserts between prune passes. Pruning also runs when the store is
+    # opened and on the first insert of each process, because the app is
+    # restarted at every logon and many sessions never reach 100 switches.
+    PRUNE_EVERY = 100
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._inserts = 0
+        self._conn = None
+        try:
+            # One shared connection, serialized by _lock — writes come from
+            # the adapter pool and reads from Flask request threads.
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS switch_events (
+                    id        INTEGER PRIMARY KEY,
+                    ts        REAL NOT NULL,
+                    interface TEXT,
+                    from_ssid TEXT,
+                    to_ssid   TEXT,
+                    plan      TEXT,
+                    outcome   TEXT NOT NULL,
+                    forced    INTEGER NOT NULL DEFAULT 0,
+                    queue_ms  REAL,
+                    apply_ms  REAL,
+                    verify_ms REAL,
+                    total_ms  REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_switch_events_ts
+                    ON switch_events (ts);
+                CREATE INDEX IF NOT EXISTS idx_switch_events_to_ssid
+                    ON switch_events (to_ssid, ts);
+                CREATE INDEX IF NOT EXISTS idx_switch_events_from_ssid
+                    ON switch_events (from_ssid, ts);
+            """)
+            with conn:
+                self._prune(conn)
+            self._conn = conn
+        except sqlite3.Error as e:
+            # History is diagnostic only — never let it stop the monitor
+            logging.error(f"[EVENTS] Event store unavailable ({path}): {e}", exc_info=True)
+
+    def record(self, **event):
+        """Inserts one switch event. Keys are SWITCH_EVENT_COLUMNS minus id."""
+        if self._conn is None:
+            return
+        columns = [column for column in SWITCH_EVENT_COLUMNS[1:] if column in event]
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    f"INSERT INTO switch_events ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [event[column] for column in columns]
+                )
+                self._inserts += 1
+                if self._inserts % self.PRUNE_EVERY == 1:
+                    self._prune(self._conn)
+        except sqlite3.Error as e:
+            logging.error(f"[EVENTS] Could not record switch event: {e}", exc_info=True)
+
+    @staticmethod
+    def _prune(conn):
+        """Keeps only the newest max_switch_events rows (range delete on the primary key)."""
+        conn.execute(
+            "DELETE FROM switch_events WHERE id <= "
+            "(SELECT MAX(id) FROM switch_events) - ?",
+            (max_switch_events,)
+        )
+
+    def query(self, ssid=None, since=None, until=None, limit=100):
+        """
+        Returns the newest events (as dicts) first. ssid matches either end
+        of the switch; since/until are Unix timestamps.
+        """
+        if self._conn is None:
+            return []
+        clauses, params = [], []
+        if ssid is not None:
+            clauses.append("(to_ssid = ? OR from_ssid = ?)")
+            params += [ssid, ssid]
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT * FROM switch_events {where} ORDER BY ts DESC LIMIT ?",
+                    params + [limit]
+                ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"[EVENTS] Could not query switch events: {e}", exc_info=True)
+            return []
+        return [dict(row) for row in rows]
+
+    def network_stats(self, since=None):
+        """
+        Per-network latency summary (keyed by the SSID switched TO),
+        slowest average first.
+        """
+        if self._conn is None:
+            return []
+        where, params = ("WHERE ts >= ?", [since]) if since is not None else ("", [])
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"""
+                    SELECT to_ssid,
+                           COUNT(*)                                  AS switches,
+                           SUM(outcome = '{STATUS_ERROR}')           AS failures,
+                           ROUND(AVG(total_ms), 1)                   AS avg_ms,
+                           ROUND(MAX(total_ms), 1)                   AS max_ms,
+                           ROUND(AVG(apply_ms), 1)                   AS avg_apply_ms,
+                           MAX(ts)                                   AS last_ts
+                    FROM switch_events {where}
+                    GROUP BY to_ssid
+                    ORDER BY avg_ms DESC
+                    """,
+                    params
+                ).fetchall()
+        except sqlite3.Error as e:
+            logging.error(f"[EVENTS] Could not compute network stats: {e}", exc_info=True)
+            return []
+        return [dict(row) for row in rows]
+
+
+event_store = EventStore(events_db_file)
+
+
+def describe_plan(ssid, plan):
+    """Short, human-readable plan label stored with each switch event."""
+    if plan is None:
+        if ssid and ssid in _apply_plans and _apply_plans[ssid] is None:
+            return "invalid profile"
+        return "dhcp"
+    return f"static {plan.ip}/{plan.subnet}"
+
+
+# === Monitor Loop ===
+class AdapterMonitor:
+    """
+    Tracks one wireless adapter independently: its last SSID and plan,
+    SSID debounce, and the apply currently running for it (if any).
+
+    The monitor loop owns this object between ticks; while an apply is in
+    flight the loop skips the adapter, so the worker thread and the loop
+    never touch the same state at the same time.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.last_ssid = None
+        self.last_plan = None
+        self.pending_ssid = None
+        self.pending_count = 0
+        self.future = None
+        self.status = None          # last TrayStatus published for this adapter
+        self.ip_refresh_left = 0    # ticks left to wait for a DHCP lease
+
+    def is_busy(self):
+        return self.future is not None and not self.future.done()
+
+    def evaluate(self, ssid, plans, owner=None):
+        """
+        Decides whether this tick needs an apply.
+        Returns (plan, force, from_ssid) to apply, or None if nothing to do.
+        owner comes from assign_unpinned_owners() — see match_apply_plan().
+
+        An SSID change is only acted on once it has been seen on
+        `ssid_debounce_probes` consecutive probes, so a brief roam or
+        reconnect does not flip the adapter back and forth.
+        """
+        plan = match_apply_plan(plans, ssid, self.name, owner)
+
+        if ssid != self.last_ssid:
+            if ssid != self.pending_ssid:
+                self.pending_ssid = ssid
+                self.pending_count = 0
+            self.pending_count += 1
+            if self.pending_count < ssid_debounce_probes:
+                return None
+
+            logging.info(
+                f"[MONITOR] '{self.name}' SSID changed: '{self.last_ssid}' → '{ssid}'"
+            )
+            from_ssid = self.last_ssid
+            self.last_ssid = ssid
+            self.last_plan = plan
+            self.pending_ssid = None
+            self.pending_count = 0
+            return plan, False, from_ssid
+
+        self.pending_ssid = None
+        self.pending_count = 0
+        if plan != self.last_plan:
+            # Same network, but its profile was added, edited or deleted
+            logging.info(
+                f"[MONITOR] Profile for '{self.name}' SSID '{ssid}' changed. "
+                f"Re-evaluating."
+            )
+            self.last_plan = plan
+            return plan, True, ssid
+        return None
+
+    def apply(self, ssid, plan, force, from_ssid, detected_at):
+        """
+        Runs on the adapter pool: applies the plan, publishes status and
+        records a switch event with per-step timings. detected_at is the
+        perf_counter() value when the monitor decided to apply, so
+        queue_ms is the time spent waiting for a free pool worker.
+        """
+        started = time.perf_counter()
+        apply_ms = verify_ms = None
+        mode = STATUS_ERROR
+        try:
+            with trace_span("apply", self.name):
+                mode = apply_plan(self.name, ssid, plan, force=force)
+            applied = time.perf_counter()
+            apply_ms = (applied - started) * 1000.0
+            # Verify by reading the adapter back — only after an apply, so
+            # steady-state ticks cost no extra netsh calls. Right after a
+            # DHCP revert the lease is not in place yet, so the IP is left
+            # blank and re-read on the next few ticks by refresh_ip().
+            ip = None
+            if mode != STATUS_ERROR:
+                with trace_span("verify", self.name):
+                    mode, ip = self.verify(ssid, plan, mode)
+                verify_ms = (time.perf_counter() - applied) * 1000.0
+            self.ip_refresh_left = dhcp_ip_refresh_probes if mode == STATUS_DHCP else 0
+            self.publish(TrayStatus(mode, ssid, ip, self.name))
+        except Exception as e:
+            mode = STATUS_ERROR
+            logging.error(f"[MONITOR] Apply failed on '{self.name}': {e}", exc_info=True)
+            self.ip_refresh_left = 0
+            self.publish(TrayStatus(STATUS_ERROR, ssid, None, self.name))
+            # Forget the SSID so the next tick retries the apply
+            self.last_ssid = None
+            self.last_plan = None
+
+        event_store.record(
+            ts=time.time(),
+            interface=self.name,
+            from_ssid=from_ssid,
+            to_ssid=ssid,
+            plan=describe_plan(ssid, plan),
+            outcome=mode,
+            forced=int(force),
+            queue_ms=(started - detected_at) * 1000.0,
+            apply_ms=apply_ms,
+            verify_ms=verify_ms,
+            total_ms=(time.perf_counter() - detected_at) * 1000.0,
+        )
+
+    def verify(self, ssid, plan, mode):
+        """
+        Checks that the adapter really ended up in `mode`.
+        Returns (mode, ip) — mode becomes STATUS_ERROR on a mismatch.
+        """
+        if mode == STATUS_STATIC:
+            ip = get_current_ip(self.name)
+            if ip != plan.ip:
+                logging.error(
+                    f"[MONITOR] Verify failed on '{self.name}' for SSID '{ssid}': "
+                    f"expected {plan.ip}, adapter reports {ip}."
                 )
-                last_ssid = ssid
-
-                if ssid and ssid in config:
-                    # Known SSID — apply the saved static IP if not already set
-                    ip_config = config[ssid]
-                    current_ip = get_current_ip(interface_name)
-                    if current_ip != ip_config["ip"]:
-                        logging.info(
-                            f"[MONITOR] Applying static IP for SSID '{ssid}'."
-                        )
-                        set_static_ip(
-                            interface_name,
-                            ip_config["ip"],
-                            ip_config["subnet"],
-                            ip_config["gateway"],
-                            ip_config["preferred_dns"],
-                            ip_config["alternate_dns"]
-                        )
-                    else:
-                        logging.info(
-                            f"[MONITOR] Static IP already correct for '{ssid}'."
-                        )
-                else:
-                    # Unknown SSID (or disconnected) — revert to DHCP
-                    # FIXED #5: Use is_dhcp_enabled() instead of "0.0.0.0" check.
-                    # Old check: current_ip != "0.0.0.0"
-                    # Problem:   DHCP gives real IPs (192.168.x.x), not 0.0.0.0.
-                    #            So set_dhcp_ip() was called even when already on DHCP,
-                    #            causing an unnecessary network reset every 5 seconds.
-                    # Fix:       Ask netsh if DHCP is enabled. Only call set_dhcp_ip()
-                    #            if the interface is currently using a static config.
-                    if not is_dhcp_enabled(interface_name):
-                        logging.info(
-                            f"[MONITOR] SSID '{ssid}' not in config. "
-                            f"Reverting to DHCP."
-                        )
-                        set_dhcp_ip(interface_name)
-                    else:
-                        logging.info(
-                            f"[MONITOR] SSID '{ssid}' not in config. "
-                            f"Already on DHCP, no action needed."
-                        )
-
-            time.sleep(check_interval)
+                return STATUS_ERROR, ip
+            return mode, ip
 
+        if not is_dhcp_enabled(self.name):
+            logging.error(
+                f"[MONITOR] Verify failed on '{self.name}' for SSID '{ssid}': "
+                f"DHCP is not enabled after revert."
+            )
+            return STATUS_ERROR, None
+        return mode, None
+
+    def publish(self, status):
+        self.status = status
+        status_channel.publish(status)
+
+    def publish_current_state(self):
+        """
+        Runs on the adapter pool for a newly discovered adapter that is not
+        connected (no SSID change, so no apply): reports whether it is
+        currently on DHCP or static so the tray has a mode to show.
+        """
+        try:
+            if is_dhcp_enabled(self.name):
+                self.ip_refresh_left = dhcp_ip_refresh_probes
+                self.publish(TrayStatus(STATUS_DHCP, None, None, self.name))
+            else:
+                self.publish(TrayStatus(
+                    STATUS_STATIC, None, get_current_ip(self.name), self.name
+                ))
         except Exception as e:
-            logging.error(f"[MONITOR] Exception: {e}", exc_info=True)
-            time.sleep(check_interval)
+            logging.error(f"[MONITOR] Could not read state of '{self.name}': {e}", exc_info=True)
+            self.publish(TrayStatus(STATUS_ERROR, None, None, self.name))
+
+    def refresh_ip(self):
+        """
+        Runs on the adapter pool on the ticks after a DHCP revert: re-reads
+        the IP until a real lease (not empty, not APIPA 169.254.x.x) shows
+        up, then updates the tooltip. Gives up after dhcp_ip_refresh_probes.
+        """
+        self.ip_refresh_left -= 1
+        try:
+            ip = get_current_ip(self.name)
+        except Exception as e:
+            logging.error(f"[MONITOR] IP refresh failed on '{self.name}': {e}", exc_info=True)
+            return
+        if ip and not ip.startswith("169.254.") and self.status is not None:
+            self.ip_refresh_left = 0
+            self.publish(self.status._replace(ip=ip))
+
+
+def run_monitor_tick(adapters, pool, logged_conflicts):
+    """
+    One monitor iteration: probe every adapter, then hand each adapter that
+    needs work to the pool. Mutates `adapters` ({name: AdapterMonitor}) and
+    `logged_conflicts` in place. Traced as the "tick" span, with "probe" and
+    "match" nested inside it; the "apply" / "verify" spans it triggers run
+    on the AdapterWorker threads.
+    """
+    with trace_span("probe"):
+        interfaces = get_wifi_interfaces()
+
+    # Drop adapters that have disappeared (e.g. a USB dongle was
+    # unplugged) BEFORE the no-adapter early return below, so the
+    # last adapter going away does not leave a stale tray slot.
+    for name in list(adapters):
+        if name not in interfaces:
+            logging.info(f"[MONITOR] Interface removed: '{name}'")
+            del adapters[name]
+            status_channel.discard(name)
+
+    # --- Lazy interface detection with retry ---
+    # With 0s Task Scheduler delay, the Wi-Fi adapter may not be
+    # enumerable yet when the app starts. We retry every
+    # check_interval seconds until an adapter reports itself.
+    if not interfaces:
+        status_channel.publish(
+            TrayStatus(STATUS_NO_ADAPTER, None, None, None)
+        )
+        logging.info(
+            "[MONITOR] Wi-Fi adapter not ready yet. "
+            f"Retrying in {check_interval}s..."
+        )
+        return
+    status_channel.discard(None)
+
+    plans = _apply_plans
+    owners = assign_unpinned_owners(interfaces, plans, adapters)
+    for ssid, owner in owners.items():
+        conflict = (ssid, owner)
+        if conflict not in logged_conflicts:
+            others = [n for n, s in interfaces.items() if s == ssid and n != owner]
+            logging.warning(
+                f"[MONITOR] SSID '{ssid}' is connected on several adapters "
+                f"but its profile is not pinned to one. Static IP goes to "
+                f"'{owner}' only; {', '.join(repr(n) for n in others)} use DHCP. "
+                f"Set 'interface' on the profile to choose explicitly."
+            )
+    logged_conflicts.clear()
+    logged_conflicts.update(owners.items())
+
+    for name, ssid in interfaces.items():
+        adapter = adapters.get(name)
+        is_new = adapter is None
+        if is_new:
+            logging.info(f"[MONITOR] Interface resolved: '{name}'")
+            adapter = adapters[name] = AdapterMonitor(name)
+
+        # Still applying from an earlier tick — look again next time
+        if adapter.is_busy():
+            continue
+
+        with trace_span("match", name):
+            action = adapter.evaluate(ssid, plans, owners.get(ssid))
+        if action is not None:
+            plan, force, from_ssid = action
+            adapter.future = pool.submit(
+                adapter.apply, ssid, plan, force, from_ssid,
+                time.perf_counter()
+            )
+        elif is_new:
+            # Present but not connected — nothing to apply, but
+            # the tray still needs a mode for this adapter.
+            adapter.future = pool.submit(adapter.publish_current_state)
+        elif adapter.ip_refresh_left > 0:
+            adapter.future = pool.submit(adapter.refresh_ip)
+
+
+def monitor_ssid_loop():
+    """
+    Polls every wireless adapter every `check_interval` seconds.
+    When an adapter's SSID changes, applies the matching static IP config
+    or reverts it to DHCP if no config exists for that SSID.
+
+    All adapters are probed with a single netsh call; the per-adapter
+    current-IP checks and netsh applies then run concurrently on a bounded
+    thread pool, so one slow adapter does not hold up the others. Adapters
+    that appear (USB dongles) are picked up on the next tick; adapters that
+    disappear are dropped. An unpinned static profile is only ever applied
+    to one adapter at a time (see assign_unpinned_owners()).
+
+    Also wakes immediately when config_changed is set, so editing the
+    profile of the network you are already on takes effect right away
+    instead of waiting for the next SSID change.
+    """
+    adapters = {}
+    logged_conflicts = set()  # (ssid, owner) pairs already warned about
+    logging.info("[MONITOR] SSID monitoring started.")
+
+    with ThreadPoolExecutor(
+        max_workers=max_adapter_workers,
+        thread_name_prefix="AdapterWorker"
+    ) as pool:
+        while True:
+            try:
+                # Clear BEFORE probing: a config change that lands during this
+                # tick sets the event again and wakes us right after it.
+                config_changed.clear()
+
+                with trace_span("tick"):
+                    run_monitor_tick(adapters, pool, logged_conflicts)
+
+                # Sleep until the next poll, or wake early on a config change
+                config_changed.wait(check_interval)
+
+            except Exception as e:
+                logging.error(f"[MONITOR] Exception: {e}", exc_info=True)
+                time.sleep(check_interval)
 
 
 # === Flask Routes ===
+@app.template_filter('localtime')
+def format_localtime(ts):
+    """Jinja filter: Unix timestamp → 'YYYY-MM-DD HH:MM:SS' in local time."""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts)) if ts else ""
+
+
 @app.route('/')
 def index():
     """
     Main config page. Shows existing SSID profiles + the add/edit form.
     Reads ?saved=1 from the URL to decide whether to show the success banner.
     The banner appears only immediately after a save — not on normal page loads.
+    If the config file cannot be parsed, the page shows the error instead of
+    the profiles; the file is left untouched for the user to fix.
     """
-    config = load_or_create_config()
+    config_error = None
+    try:
+        config = read_config_file()
+    except CONFIG_READ_ERRORS as e:
+        logging.warning(f"[WEB] Config file could not be read: {e}")
+        config, config_error = {}, str(e)
     saved = request.args.get('saved', '0') == '1'
-    return render_template('index.html', existing_config=config, saved=saved)
+    # Issues come sorted errors-first, so the cap keeps every error that
+    # fits and drops warnings first. A large import can produce thousands.
+    lint_issues = lint_profiles(config)
+    return render_template(
+        'index.html',
+        existing_config=config,
+        config_error=config_error,
+        config_file=config_file,
+        saved=saved,
+        lint_issues=lint_issues[:lint_display_limit],
+        lint_hidden=max(0, len(lint_issues) - lint_display_limit),
+        network_stats=event_store.network_stats(),
+        recent_events=event_store.query(limit=20)
+    )
 
 
 def is_valid_ipv4(value):
@@ -505,6 +1596,7 @@ def submit_config():
     gateway = request.form['gateway'].strip()
     preferred_dns = request.form['preferred_dns'].strip()
     alternate_dns = request.form.get('alternate_dns', '').strip()
+    interface = request.form.get('interface', '').strip()  # optional adapter pin
 
     # Server-side validation — required fields must all be present
     if not all([ssid, ip, subnet, gateway, preferred_dns]):
@@ -514,38 +1606,152 @@ def submit_config():
     # Server-side IP format validation
     # Client-side JS is bypassable (e.g. via curl or modified requests).
     # Reject malformed IPs here before they reach netsh and cause adapter errors.
-    invalid_fields = []
-    for field_name, field_val in [
-        ("IP Address", ip),
-        ("Subnet Mask", subnet),
-        ("Gateway", gateway),
-        ("Preferred DNS", preferred_dns),
-    ]:
-        if not is_valid_ipv4(field_val):
-            invalid_fields.append(field_name)
-
-    if alternate_dns and not is_valid_ipv4(alternate_dns):
-        invalid_fields.append("Alternate DNS")
-
-    if invalid_fields:
-        logging.warning(
-            f"[WEB] Submit failed: invalid IP format in fields: {', '.join(invalid_fields)}"
-        )
-        return f"Error: Invalid IP format in: {', '.join(invalid_fields)}.", 400
-
-    config = load_or_create_config()
-    config[ssid] = {
+    # The same compile step the monitor relies on is run at save time, so a
+    # profile that saves successfully is guaranteed to have a usable plan.
+    profile = {
         "ip": ip,
         "subnet": subnet,
         "gateway": gateway,
         "preferred_dns": preferred_dns,
-        "alternate_dns": alternate_dns
+        "alternate_dns": alternate_dns,
+        "interface": interface
     }
+    try:
+        compile_apply_plan(ssid, profile)
+    except ValueError as e:
+        logging.warning(f"[WEB] Submit failed: {e}")
+        return f"Error: {e}.", 400
+
+    # Lint against the whole store as it would look after this save.
+    # Errors in THIS profile block the save; warnings (shared subnets,
+    # duplicate IPs) are logged and listed on the index page.
+    try:
+        config = read_config_file()
+    except CONFIG_READ_ERRORS as e:
+        # Saving now would overwrite every other (unreadable) profile
+        logging.warning(f"[WEB] Submit refused, config file unreadable: {e}")
+        return f"Error: config file could not be read ({e}). Fix {config_file} first.", 409
+    config[ssid] = profile
+    issues = [issue for issue in lint_profiles(config) if ssid in issue.ssids]
+    errors = [issue.message for issue in issues if issue.severity == LINT_ERROR]
+    if errors:
+        logging.warning(f"[WEB] Submit failed for '{ssid}': {' '.join(errors)}")
+        return f"Error: {' '.join(errors)}", 400
+    for issue in issues:
+        logging.warning(f"[LINT] {issue.message} ({', '.join(issue.ssids)})")
+
     save_config(config)
     logging.info(f"[WEB] Config saved for SSID: '{ssid}'")
     return redirect(url_for('index', saved=1))
 
 
+@app.route('/lint')
+def lint_config():
+    """
+    Full-store audit. Returns every lint issue across all saved profiles
+    as JSON, e.g. for checking a large imported config file.
+    """
+    try:
+        config = read_config_file()
+    except CONFIG_READ_ERRORS as e:
+        return jsonify({"error": f"Config file could not be read: {e}"}), 409
+    issues = lint_profiles(config)
+    return jsonify({
+        "profiles": len(config),
+        "errors": sum(1 for issue in issues if issue.severity == LINT_ERROR),
+        "warnings": sum(1 for issue in issues if issue.severity == LINT_WARNING),
+        "issues": [issue._asdict() for issue in issues],
+    })
+
+
+def parse_optional_float(name):
+    """Reads an optional numeric query parameter; raises ValueError if malformed."""
+    value = request.args.get(name, '').strip()
+    return float(value) if value else None
+
+
+@app.route('/events')
+def list_events():
+    """
+    Switch history as JSON, newest first.
+    Query params: ssid, since / until (Unix timestamps), limit (max 1000).
+    """
+    try:
+        since = parse_optional_float('since')
+        until = parse_optional_float('until')
+        limit = int(request.args.get('limit', '100'))
+    except ValueError:
+        return "Error: since/until must be Unix timestamps and limit a whole number.", 400
+
+    ssid = request.args.get('ssid', '').strip() or None
+    limit = max(1, min(limit, 1000))
+    return jsonify({"events": event_store.query(ssid, since, until, limit)})
+
+
+@app.route('/events/stats')
+def event_stats():
+    """Per-network switch latency summary as JSON. Optional ?since= timestamp."""
+    try:
+        since = parse_optional_float('since')
+    except ValueError:
+        return "Error: since must be a Unix timestamp.", 400
+    return jsonify({"networks": event_store.network_stats(since)})
+
+
+@app.route('/profiling')
+def profiling_status():
+    """Reports whether tick tracing / sampling are active and what is ready to export."""
+    return jsonify({
+        "tracing": _tracing_enabled,
+        "trace_events": len(_trace_events),
+        "sampling": _sampler_running,
+        "sample_profile_ready": _last_sample_profile is not None,
+    })
+
+
+@app.route('/profiling/trace', methods=['GET', 'POST'])
+def profiling_trace():
+    """
+    POST enabled=1|0 toggles per-tick span tracing.
+    GET downloads the recorded spans as a Chrome trace file.
+    """
+    if request.method == 'POST':
+        set_tracing(request.values.get('enabled', '1') == '1')
+        return profiling_status()
+
+    return Response(
+        json.dumps(export_chrome_trace()),
+        mimetype='application/json',
+        headers={"Content-Disposition": "attachment; filename=wifi_ip_switcher-trace.json"}
+    )
+
+
+@app.route('/profiling/sample', methods=['GET', 'POST'])
+def profiling_sample():
+    """
+    POST seconds=N starts the sampling profiler in the background.
+    GET downloads the last finished run as a speedscope file.
+    """
+    if request.method == 'POST':
+        try:
+            seconds = int(request.values.get('seconds', '10'))
+        except ValueError:
+            return "Error: seconds must be a whole number.", 400
+        if not 1 <= seconds <= max_sample_seconds:
+            return f"Error: seconds must be between 1 and {max_sample_seconds}.", 400
+        if not start_sampling_profiler(seconds):
+            return "Error: a sampling run is already in progress.", 409
+        return profiling_status(), 202
+
+    if _last_sample_profile is None:
+        return "Error: no sampling profile has been captured yet.", 404
+    return Response(
+        json.dumps(_last_sample_profile),
+        mimetype='application/json',
+        headers={"Content-Disposition": "attachment; filename=wifi_ip_switcher.speedscope.json"}
+    )
+
+
 @app.route('/delete', methods=['POST'])
 def delete_config():
     """
@@ -554,7 +1760,11 @@ def delete_config():
     """
     ssid = request.form.get('ssid', '').strip()
     if ssid:
-        config = load_or_create_config()
+        try:
+            config = read_config_file()
+        except CONFIG_READ_ERRORS as e:
+            logging.warning(f"[WEB] Delete refused, config file unreadable: {e}")
+            return f"Error: config file could not be read ({e}). Fix {config_file} first.", 409
         if ssid in config:
             del config[ssid]
             save_config(config)
@@ -605,6 +1815,96 @@ def open_browser():
 
 
 # === Tray Icon ===
+# Badge colour drawn in the bottom-right corner of the icon for each mode
+STATUS_BADGE_COLORS = {
+    STATUS_STATIC: (0, 102, 204),      # blue
+    STATUS_DHCP: (82, 196, 26),        # green
+    STATUS_APPLYING: (250, 173, 20),   # amber
+    STATUS_ERROR: (255, 77, 79),       # red
+    STATUS_NO_ADAPTER: (140, 140, 140),  # grey
+}
+
+STATUS_LABELS = {
+    STATUS_STATIC: "Static IP",
+    STATUS_DHCP: "DHCP",
+    STATUS_APPLYING: "Applying...",
+    STATUS_ERROR: "Error",
+    STATUS_NO_ADAPTER: "Wi-Fi adapter not found",
+}
+
+
+def build_status_icons(base_image):
+    """
+    Renders one icon variant per status mode, once, at startup.
+    Status updates then just swap between these cached images — no PIL
+    drawing happens while the app is running.
+    """
+    base = base_image.convert("RGBA").resize((64, 64))
+    icons = {}
+    for mode, color in STATUS_BADGE_COLORS.items():
+        variant = base.copy()
+        draw = ImageDraw.Draw(variant)
+        draw.ellipse((36, 36, 63, 63), fill=color, outline="white", width=3)
+        icons[mode] = variant
+    return icons
+
+
+# When several adapters are tracked, the icon shows the most urgent mode
+STATUS_PRIORITY = [
+    STATUS_ERROR, STATUS_APPLYING, STATUS_STATIC, STATUS_DHCP, STATUS_NO_ADAPTER
+]
+
+
+def summarize_tray_status(statuses):
+    """Returns the single mode the icon should show for all adapters."""
+    modes = {status.mode for status in statuses.values()}
+    for mode in STATUS_PRIORITY:
+        if mode in modes:
+            return mode
+    return STATUS_ERROR
+
+
+def format_tray_tooltip(statuses):
+    """
+    Builds the hover text for the tray icon, one line per adapter, e.g.
+      Wi-Fi IP Switcher
+      Wi-Fi: Static IP | SSID: Office | IP: 10.0.1.45
+      Wi-Fi 2: DHCP | SSID: Home | IP: 192.168.1.23
+    Windows truncates tray tooltips at 127 characters, so we do it first.
+    """
+    lines = ["Wi-Fi IP Switcher"]
+    for interface, status in sorted(statuses.items(), key=lambda kv: kv[0] or ""):
+        parts = [STATUS_LABELS.get(status.mode, status.mode)]
+        if status.ssid:
+            parts.append(f"SSID: {status.ssid}")
+        elif interface and status.mode in (STATUS_STATIC, STATUS_DHCP):
+            parts.append("Not connected")
+        if status.ip:
+            parts.append(f"IP: {status.ip}")
+        prefix = f"{interface}: " if interface else ""
+        lines.append(prefix + " | ".join(parts))
+    return "\n".join(lines)[:127]
+
+
+def tray_status_loop(tray_icon, status_icons):
+    """
+    Consumes the status channel and updates the tray icon and tooltip.
+    Runs on its own thread so the monitor never waits on the tray.
+    """
+    shown = None
+    while True:
+        statuses = status_channel.wait()
+        if not statuses or statuses == shown:
+            continue
+        try:
+            mode = summarize_tray_status(statuses)
+            tray_icon.icon = status_icons.get(mode, status_icons[STATUS_ERROR])
+            tray_icon.title = format_tray_tooltip(statuses)
+            shown = statuses
+        except Exception as e:
+            logging.error(f"[TRAY] Could not update tray status: {e}", exc_info=True)
+
+
 def start_tray_icon(interface_name):
     """
     Creates and runs the system tray icon with its context menu.
@@ -635,6 +1935,8 @@ def start_tray_icon(interface_name):
         logging.critical("[TRAY] Could not create icon image. Exiting.")
         os._exit(1)
 
+    status_icons = build_status_icons(icon_to_use)
+
     # --- Tray menu callbacks ---
 
     def show_logs(icon_instance, item):
@@ -670,6 +1972,31 @@ def start_tray_icon(interface_name):
         logging.info(f"[TRAY] Opening config page in browser on port {active_port}.")
         webbrowser.open(f"http://127.0.0.1:{active_port}/")
 
+    def toggle_tracing(icon_instance, item):
+        """
+        Turns tick tracing on, or off — in which case the recorded spans
+        are written to a Chrome trace file next to the log.
+        """
+        if _tracing_enabled:
+            set_tracing(False)
+            try:
+                write_profile_file("trace", export_chrome_trace())
+            except Exception as e:
+                logging.error(f"[TRAY] Could not write trace file: {e}", exc_info=True)
+        else:
+            set_tracing(True)
+
+    def capture_profile(icon_instance, item):
+        """Samples all threads for 30s and writes a speedscope file next to the log."""
+        def on_done(profile):
+            try:
+                write_profile_file("profile", profile)
+            except Exception as e:
+                logging.error(f"[TRAY] Could not write profile file: {e}", exc_info=True)
+
+        if not start_sampling_profiler(30, on_done=on_done):
+            logging.info("[TRAY] Sampling already in progress.")
+
     def on_quit(icon_instance, item):
         """Stops the tray icon and terminates the process."""
         logging.info("[TRAY] Quit requested. Shutting down.")
@@ -683,13 +2010,36 @@ def start_tray_icon(interface_name):
     menu = Menu(
         MenuItem("View Log", show_logs),
         MenuItem("Manage IP Profiles", open_manage_page),
+        MenuItem("Diagnostics", Menu(
+            MenuItem(
+                "Trace Monitor Ticks",
+                toggle_tracing,
+                checked=lambda item: _tracing_enabled
+            ),
+            MenuItem("Capture CPU Profile (30s)", capture_profile)
+        )),
         MenuItem("Quit", on_quit)
     )
 
+    def on_tray_ready(icon_instance):
+        """Runs once the tray icon exists — start consuming status updates."""
+        icon_instance.visible = True
+        threading.Thread(
+            target=tray_status_loop,
+            args=(icon_instance, status_icons),
+            name="TrayStatusThread",
+            daemon=True
+        ).start()
+
     try:
-        tray_icon = Icon("WiFiIPSwitcher", icon_to_use, "Wi-Fi IP Switcher", menu)
+        tray_icon = Icon(
+            "WiFiIPSwitcher",
+            status_icons[STATUS_NO_ADAPTER] if interface_name is None else icon_to_use,
+            "Wi-Fi IP Switcher",
+            menu
+        )
         logging.info("[TRAY] Tray icon running.")
-        tray_icon.run()  # blocks this thread until icon.stop() is called
+        tray_icon.run(setup=on_tray_ready)  # blocks this thread until icon.stop() is called
     except Exception as e:
         logging.critical(f"[TRAY] Fatal tray error: {e}", exc_info=True)
         os._exit(1)
@@ -725,7 +2075,7 @@ def main():
     # --- Step 2: Attempt Wi-Fi interface detection before starting threads ---
     # Called once here for an early log entry. May return None if the adapter
     # isn't enumerable yet (0s Task Scheduler delay). monitor_ssid_loop
-    # retries detection automatically every check_interval seconds, so None
+    # re-discovers all adapters every check_interval seconds, so None
     # here is safe — it does NOT lock in a wrong fallback for the session.
     interface_name = get_wifi_interface_name()
     if interface_name:
@@ -736,7 +2086,17 @@ def main():
             "Monitor thread will retry interface detection automatically."
         )
 
-    # --- Step 3: Start background threads ---
+    # --- Step 3: Compile profiles and start background threads ---
+    reload_apply_plans()
+
+    watcher_thread = threading.Thread(
+        target=watch_config_file_loop,
+        name="ConfigWatcherThread",
+        daemon=True
+    )
+    watcher_thread.start()
+    logging.info("[MAIN] Config watcher thread started.")
+
     flask_thread = threading.Thread(
         target=start_flask_app,
         name="FlaskThread",
@@ -745,17 +2105,16 @@ def main():
     flask_thread.start()
     logging.info("[MAIN] Flask thread started.")
 
-    # interface_name passed as argument — no global dependency
+    # The monitor discovers (and re-discovers) every adapter itself
     monitor_thread = threading.Thread(
         target=monitor_ssid_loop,
-        args=(interface_name,),   # explicit parameter, not global
         name="MonitorThread",
         daemon=False
     )
     monitor_thread.start()
     logging.info("[MAIN] Monitor thread started.")
 
-    # interface_name passed to tray as well (for future tray notifications)
+    # interface_name passed to tray as well — picks the initial icon variant
     tray_thread = threading.Thread(
         target=start_tray_icon,
         args=(interface_name,),
@@ -768,8 +2127,13 @@ def main():
     # --- Step 4: Open browser on first run ---
     # Wait 2s for Flask to bind before opening the browser
     time.sleep(2)
-    if not os.path.exists(config_file) or load_or_create_config() == {}:
-        logging.info("[MAIN] No config found. Opening browser for initial setup.")
+    try:
+        has_config = read_config_file() != {}
+    except CONFIG_READ_ERRORS as e:
+        logging.error(f"[MAIN] Config file could not be read: {e}")
+        has_config = False  # open the UI so the user sees the error banner
+    if not has_config:
+        logging.info("[MAIN] No usable config found. Opening browser.")
         open_browser()
     else:
         logging.info("[MAIN] Config found. Running silently in background.")